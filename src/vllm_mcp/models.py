@@ -1,54 +1,72 @@
 """Data models for multimodal interactions."""
 
 from typing import Any, Dict, List, Optional, Union
-from pydantic import BaseModel, Field
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from .utils import guess_mime
+
+
+def _fill_mime_type(data: Any, source_field: str) -> Any:
+    """Fill in a missing mime_type guessed from ``source_field`` before validation.
+
+    Args:
+        data: Raw input passed to the model
+        source_field: Name of the field holding a path or filename
+
+    Returns:
+        Input data with mime_type set when it could be guessed
+    """
+    if isinstance(data, dict) and not data.get("mime_type"):
+        source = data.get(source_field)
+        if source:
+            mime_type = guess_mime(source)
+            if mime_type:
+                return {**data, "mime_type": mime_type}
+    return data
 
 
 class TextContent(BaseModel):
     """Text content model."""
+    model_config = ConfigDict(frozen=True)
     text: str = Field(..., description="Text content")
 
 
 class ImageContent(BaseModel):
     """Image content model."""
+    model_config = ConfigDict(frozen=True)
     url: Optional[str] = Field(None, description="Image URL")
     image_path: Optional[str] = Field(None, description="Local image file path")
     base64_data: Optional[str] = Field(None, description="Base64 encoded image data")
     mime_type: str = Field(..., description="Image MIME type")
     description: Optional[str] = Field(None, description="Image description")
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        # Set default mime_type if not provided and we can guess it
-        if not data.get("mime_type"):
-            if data.get("image_path"):
-                import mimetypes
-                mime_type, _ = mimetypes.guess_type(data["image_path"])
-                if mime_type:
-                    self.mime_type = mime_type
+    @model_validator(mode="before")
+    @classmethod
+    def _guess_mime_type(cls, data: Any) -> Any:
+        """Guess mime_type from image_path if not provided."""
+        return _fill_mime_type(data, "image_path")
 
 
 class FileContent(BaseModel):
     """File content model."""
+    model_config = ConfigDict(frozen=True)
     filename: str = Field(..., description="File name")
     text: Optional[str] = Field(None, description="File text content")
     file_path: Optional[str] = Field(None, description="Local file path")
     mime_type: str = Field(..., description="File MIME type")
     size: Optional[int] = Field(None, description="File size in bytes")
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        # Set default mime_type if not provided
-        if not data.get("mime_type"):
-            if data.get("filename"):
-                import mimetypes
-                mime_type, _ = mimetypes.guess_type(data["filename"])
-                if mime_type:
-                    self.mime_type = mime_type
+    @model_validator(mode="before")
+    @classmethod
+    def _guess_mime_type(cls, data: Any) -> Any:
+        """Guess mime_type from filename if not provided."""
+        return _fill_mime_type(data, "filename")
 
 
 class MultimodalRequest(BaseModel):
     """Multimodal request model."""
+    model_config = ConfigDict(frozen=True)
     model: str = Field(..., description="Model name")
     text_contents: List[TextContent] = Field(default_factory=list, description="Text content list")
     image_contents: List[ImageContent] = Field(default_factory=list, description="Image content list")
@@ -63,11 +81,12 @@ class MultimodalRequest(BaseModel):
 
     def has_multimodal_content(self) -> bool:
         """Check if request contains multimodal content."""
-        return len(self.image_contents) > 0 or len(self.file_contents) > 0
+        return bool(self.image_contents) or bool(self.file_contents)
 
 
 class MultimodalResponse(BaseModel):
     """Multimodal response model."""
+    model_config = ConfigDict(frozen=True)
     text_contents: List[TextContent] = Field(default_factory=list, description="Text content list")
     image_contents: List[ImageContent] = Field(default_factory=list, description="Generated image content")
     file_contents: List[FileContent] = Field(default_factory=list, description="Generated file content")
@@ -85,6 +104,7 @@ class MultimodalResponse(BaseModel):
 
 class ProviderConfig(BaseModel):
     """Provider configuration model."""
+    model_config = ConfigDict(frozen=True)
     provider_type: str = Field(..., description="Provider type (openai, dashscope)")
     api_key: str = Field(..., description="API key")
     base_url: Optional[str] = Field(None, description="Custom base URL")
@@ -98,6 +118,7 @@ class ProviderConfig(BaseModel):
 
 class ServerConfig(BaseModel):
     """Server configuration model."""
+    model_config = ConfigDict(frozen=True)
     host: str = Field("localhost", description="Server host")
     port: int = Field(8080, description="Server port")
     transport: str = Field("stdio", description="Transport type (stdio, http, sse)")
@@ -109,6 +130,7 @@ class ServerConfig(BaseModel):
 
 class MCPToolCall(BaseModel):
     """MCP tool call model."""
+    model_config = ConfigDict(frozen=True)
     name: str = Field(..., description="Tool name")
     arguments: Dict[str, Any] = Field(..., description="Tool arguments")
     tool_call_id: Optional[str] = Field(None, description="Tool call ID")
@@ -116,6 +138,7 @@ class MCPToolCall(BaseModel):
 
 class MCPToolResult(BaseModel):
     """MCP tool result model."""
+    model_config = ConfigDict(frozen=True)
     content: str = Field(..., description="Tool result content")
     tool_call_id: Optional[str] = Field(None, description="Tool call ID")
     is_error: bool = Field(False, description="Whether result is an error")
\ No newline at end of file
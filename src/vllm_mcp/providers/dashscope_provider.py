@@ -1,14 +1,19 @@
 """Dashscope multimodal model provider."""
 
-import base64
-import mimetypes
+import asyncio
 import json
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
-import dashscope
-from dashscope import MultiModalConversation
-from dashscope.api_entities.dashscope_response import GenerationResponse
+import aiofiles
+
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib encoder
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from dashscope.api_entities.dashscope_response import GenerationResponse
 
 from ..models import (
     MultimodalRequest,
@@ -17,19 +22,42 @@ from ..models import (
     ImageContent,
     FileContent,
 )
+from ..utils import guess_mime, read_text_file
+
+_ALLOWED_IMAGE_MIMES: frozenset[str] = frozenset({
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+})
 
 
 class DashscopeProvider:
     """Dashscope multimodal model provider."""
 
-    def __init__(self, api_key: str, supported_models: Optional[List[str]] = None):
+    # Dashscope typically supports more images than OpenAI
+    _MAX_IMAGES = 10
+
+    def __init__(
+        self,
+        api_key: str,
+        supported_models: Optional[List[str]] = None,
+        strict_validate: bool = True,
+    ):
         """Initialize Dashscope provider.
 
         Args:
             api_key: Dashscope API key
             supported_models: Optional list of supported models
+            strict_validate: Whether validate_request checks image MIME types
         """
+        # Import the SDK lazily so servers without Dashscope configured skip it
+        import dashscope
+        from dashscope import MultiModalConversation
+
         dashscope.api_key = api_key
+        self._mm = MultiModalConversation
         self.supported_models = supported_models or [
             "qwen-vl-plus",
             "qwen-vl-max",
@@ -37,6 +65,8 @@ class DashscopeProvider:
             "qwen2-vl-7b-instruct",
             "qwen2-vl-72b-instruct",
         ]
+        self._supported_set = frozenset(self.supported_models)
+        self.strict_validate = strict_validate
 
     async def generate_response(
         self, request: MultimodalRequest
@@ -50,9 +80,11 @@ class DashscopeProvider:
             Multimodal response
         """
         try:
-            messages = self._build_messages(request)
+            messages = await self._build_messages(request)
 
-            response = MultiModalConversation.call(
+            # The SDK call is blocking, so run it in a worker thread
+            response = await asyncio.to_thread(
+                self._mm.call,
                 model=request.model,
                 messages=messages,
                 max_tokens=request.max_tokens,
@@ -65,7 +97,7 @@ class DashscopeProvider:
         except Exception as e:
             raise Exception(f"Dashscope API error: {e}")
 
-    def _build_messages(self, request: MultimodalRequest) -> List[Dict[str, Any]]:
+    async def _build_messages(self, request: MultimodalRequest) -> List[Dict[str, Any]]:
         """Build Dashscope messages from multimodal request.
 
         Args:
@@ -75,6 +107,10 @@ class DashscopeProvider:
             List of Dashscope message dictionaries
         """
         messages: List[Dict[str, Any]] = []
+        text_files = [
+            file_content for file_content in request.file_contents
+            if file_content.mime_type.startswith("text/")
+        ]
 
         # Add system message if present
         if request.system_prompt:
@@ -83,23 +119,22 @@ class DashscopeProvider:
                 "content": [{"text": request.system_prompt}]
             })
 
-        # Build user message with multimodal content
-        content: List[Dict[str, Any]] = []
-
-        # Add text content
-        for text_content in request.text_contents:
-            content.append({"text": text_content.text})
+        # Build user message with multimodal content, starting with text content
+        content: List[Dict[str, Any]] = [
+            {"text": text_content.text} for text_content in request.text_contents
+        ]
 
-        # Add image content
-        for image_content in request.image_contents:
-            image_data = self._prepare_image(image_content)
-            content.append({"image": image_data})
+        # Add image content, preparing all images concurrently
+        image_parts = await asyncio.gather(
+            *(self._prepare_image(image_content) for image_content in request.image_contents)
+        )
+        content.extend({"image": image_data} for image_data in image_parts)
 
         # Add file content (text files for Dashscope)
-        for file_content in request.file_contents:
-            if file_content.mime_type.startswith("text/"):
-                text_data = self._prepare_text_file(file_content)
-                content.append({"text": text_data})
+        content.extend([
+            {"text": await self._prepare_text_file(file_content)}
+            for file_content in text_files
+        ])
 
         messages.append({
             "role": "user",
@@ -108,7 +143,7 @@ class DashscopeProvider:
 
         return messages
 
-    def _prepare_image(self, image_content: ImageContent) -> str:
+    async def _prepare_image(self, image_content: ImageContent) -> str:
         """Prepare image data for Dashscope API.
 
         Args:
@@ -120,13 +155,13 @@ class DashscopeProvider:
         if image_content.url:
             return image_content.url
         elif image_content.image_path:
-            return self._encode_image_from_path(image_content.image_path)
+            return await self._encode_image_from_path(image_content.image_path)
         elif image_content.base64_data:
             return f"data:{image_content.mime_type};base64,{image_content.base64_data}"
         else:
             raise ValueError("No valid image source provided")
 
-    def _encode_image_from_path(self, image_path: str) -> str:
+    async def _encode_image_from_path(self, image_path: str) -> str:
         """Encode image from file path to base64.
 
         Args:
@@ -135,20 +170,23 @@ class DashscopeProvider:
         Returns:
             Base64 image data URL
         """
-        path = Path(image_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-
-        mime_type, _ = mimetypes.guess_type(image_path)
+        mime_type = guess_mime(image_path)
         if not mime_type or not mime_type.startswith("image/"):
             raise ValueError(f"Invalid image file: {image_path}")
 
-        with open(path, "rb") as image_file:
-            base64_data = base64.b64encode(image_file.read()).decode("utf-8")
+        try:
+            async with aiofiles.open(image_path, "rb") as image_file:
+                raw = await image_file.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Image file not found: {image_path}")
+
+        # Encoding is CPU-bound, so keep it off the event loop
+        base64_data = await asyncio.to_thread(_b64encode, raw)
 
-        return f"data:{mime_type};base64,{base64_data}"
+        data_url = b"".join((b"data:", mime_type.encode("ascii"), b";base64,", base64_data))
+        return data_url.decode("ascii")
 
-    def _prepare_text_file(self, file_content: FileContent) -> str:
+    async def _prepare_text_file(self, file_content: FileContent) -> str:
         """Prepare text file content for Dashscope API.
 
         Args:
@@ -160,17 +198,15 @@ class DashscopeProvider:
         if file_content.text:
             return f"File: {file_content.filename}\n{file_content.text}"
         elif file_content.file_path:
-            path = Path(file_content.file_path)
-            if not path.exists():
+            try:
+                content = await read_text_file(file_content.file_path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"File not found: {file_content.file_path}")
-
-            with open(path, "r", encoding="utf-8") as file:
-                content = file.read()
             return f"File: {file_content.filename}\n{content}"
         else:
             raise ValueError("No valid text file source provided")
 
-    def _parse_response(self, response: GenerationResponse) -> MultimodalResponse:
+    def _parse_response(self, response: "GenerationResponse") -> MultimodalResponse:
         """Parse Dashscope response to multimodal response.
 
         Args:
@@ -222,9 +258,9 @@ class DashscopeProvider:
         Returns:
             True if model is supported
         """
-        return model in self.supported_models
+        return model in self._supported_set
 
-    async def validate_request(self, request: MultimodalRequest) -> bool:
+    def validate_request(self, request: MultimodalRequest) -> bool:
         """Validate multimodal request.
 
         Args:
@@ -237,22 +273,15 @@ class DashscopeProvider:
             return False
 
         # Check image count (Dashscope has limits)
-        total_images = len(request.image_contents)
-        if total_images > 10:  # Dashscope typically supports more images than OpenAI
+        if len(request.image_contents) > self._MAX_IMAGES:
             return False
 
-        # Validate image formats
-        for image_content in request.image_contents:
-            if image_content.mime_type not in [
-                "image/jpeg",
-                "image/png",
-                "image/gif",
-                "image/webp",
-                "image/bmp"
-            ]:
-                return False
+        # Validate image formats, unless image sources are trusted upstream
+        if not self.strict_validate:
+            return True
 
-        return True
+        seen_mime_types = {image_content.mime_type for image_content in request.image_contents}
+        return seen_mime_types.issubset(_ALLOWED_IMAGE_MIMES)
 
     async def stream_response(
         self, request: MultimodalRequest
@@ -264,25 +293,29 @@ class DashscopeProvider:
 
         Yields:
             Chunks of response text
-        """
-        try:
-            messages = self._build_messages(request)
 
-            response = MultiModalConversation.call(
-                model=request.model,
-                messages=messages,
-                max_tokens=request.max_tokens,
-                temperature=request.temperature,
-                stream=True,
-            )
-
-            for chunk in response:
-                if chunk.output and chunk.output.choices:
-                    choice = chunk.output.choices[0]
-                    if choice.message and choice.message.content:
-                        for content_item in choice.message.content:
-                            if "text" in content_item:
-                                yield content_item["text"]
+        Raises:
+            Exception: If the Dashscope call or the stream fails
+        """
+        messages = await self._build_messages(request)
+
+        response = await asyncio.to_thread(
+            self._mm.call,
+            model=request.model,
+            messages=messages,
+            max_tokens=request.max_tokens,
+            temperature=request.temperature,
+            stream=True,
+            # Send only new text per chunk instead of the full text so far
+            incremental_output=True,
+        )
 
-        except Exception as e:
-            yield f"Error: {e}"
\ No newline at end of file
+        # Each step of the SDK's stream iterator blocks on the network
+        chunks = iter(response)
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            if chunk.output and chunk.output.choices:
+                choice = chunk.output.choices[0]
+                if choice.message and choice.message.content:
+                    for content_item in choice.message.content:
+                        if "text" in content_item:
+                            yield content_item["text"]
\ No newline at end of file
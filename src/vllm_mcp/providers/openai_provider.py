@@ -1,14 +1,26 @@
 """OpenAI multimodal model provider."""
 
-import base64
-import mimetypes
+import asyncio
+import json
+import os
+from asyncio import sleep
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from time import monotonic
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
+import aiofiles
+import httpx
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib encoder
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode  # type: ignore[assignment]
+
 from ..models import (
     MultimodalRequest,
     MultimodalResponse,
@@ -16,26 +28,129 @@ from ..models import (
     ImageContent,
     FileContent,
 )
+from ..utils import guess_mime, read_text_file
+
+_ALLOWED_IMAGE_MIMES: frozenset[str] = frozenset({
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+})
+
+# Bounds for the per-provider cache of encoded local images
+_IMAGE_CACHE_MAX_ENTRIES = 256
+_IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Shared clients keyed by (event loop, api_key, base_url) so providers reuse one
+# connection pool; httpx pools are bound to the loop that opened their connections
+_CLIENT_CACHE: Dict[Tuple[asyncio.AbstractEventLoop, str, Optional[str]], AsyncOpenAI] = {}
+
+
+def _new_async_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """Create an async OpenAI client with a pooled HTTP client.
+
+    Args:
+        api_key: OpenAI API key
+        base_url: Optional custom base URL
+
+    Returns:
+        New AsyncOpenAI client
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        ),
+    )
+
+
+def _get_async_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """Get the cached async OpenAI client for the running event loop.
+
+    Args:
+        api_key: OpenAI API key
+        base_url: Optional custom base URL
+
+    Returns:
+        AsyncOpenAI client shared by providers on the running loop, or a new
+        client if no loop is running
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _new_async_client(api_key, base_url)
+
+    # Drop clients whose loop has been closed, e.g. by an earlier asyncio.run()
+    for stale_key in [key for key in _CLIENT_CACHE if key[0].is_closed()]:
+        del _CLIENT_CACHE[stale_key]
+
+    key = (loop, api_key, base_url)
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        client = _CLIENT_CACHE[key] = _new_async_client(api_key, base_url)
+    return client
 
 
 class OpenAIProvider:
     """OpenAI multimodal model provider."""
 
-    def __init__(self, api_key: str, base_url: Optional[str] = None, supported_models: Optional[List[str]] = None):
+    # OpenAI typically limits requests to 5 images
+    _MAX_IMAGES = 5
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        supported_models: Optional[List[str]] = None,
+        max_requests_per_minute: Optional[int] = None,
+        max_tokens_per_minute: Optional[int] = None,
+    ):
         """Initialize OpenAI provider.
 
         Args:
             api_key: OpenAI API key
             base_url: Optional custom base URL
             supported_models: Optional list of supported models
+            max_requests_per_minute: Optional request rate limit to stay under
+            max_tokens_per_minute: Optional token rate limit to stay under
         """
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self._api_key = api_key
+        self._base_url = base_url
+        self._client: Optional[AsyncOpenAI] = None
         self.supported_models = supported_models or [
             "gpt-4o",
             "gpt-4o-mini",
             "gpt-4-turbo",
             "gpt-4-vision-preview",
         ]
+        self._supported_set = frozenset(self.supported_models)
+
+        # Leaky-bucket throttle state; a limit of None disables that bucket
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self._rpm_limit = float(max_requests_per_minute or 0)
+        self._tpm_limit = float(max_tokens_per_minute or 0)
+        self._rpm_bucket = self._rpm_limit
+        self._tpm_bucket = self._tpm_limit
+        self._last_refill = monotonic()
+        self._lock = asyncio.Lock()
+
+        # Encoded data URLs keyed by (absolute path, mtime_ns, size); a changed file gets a new key
+        self._image_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._image_cache_bytes = 0
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Async OpenAI client for the running event loop."""
+        if self._client is not None:
+            return self._client
+        return _get_async_client(self._api_key, self._base_url)
+
+    @client.setter
+    def client(self, client: AsyncOpenAI) -> None:
+        """Pin a specific client, bypassing the shared per-loop cache."""
+        self._client = client
 
     async def generate_response(
         self, request: MultimodalRequest
@@ -49,24 +164,238 @@ class OpenAIProvider:
             Multimodal response
         """
         try:
-            messages = self._build_messages(request)
-
-            response = self.client.chat.completions.create(
+            # Prepare images and files while waiting on the rate limiter
+            messages_task = asyncio.create_task(self._build_messages(request))
+            try:
+                await self._throttle(self._estimate_tokens(request))
+            except BaseException:
+                messages_task.cancel()
+                raise
+            messages = await messages_task
+
+            response = await self.client.chat.completions.create(
                 model=request.model,
                 messages=messages,
                 max_tokens=request.max_tokens,
                 temperature=request.temperature,
                 stream=False,
             )
+            self._on_success()
 
             return self._parse_response(response)
 
+        except openai.RateLimitError as e:
+            self._on_rate_limited()
+            raise Exception(f"OpenAI API error: {e}")
         except openai.APIError as e:
             raise Exception(f"OpenAI API error: {e}")
         except Exception as e:
             raise Exception(f"Error generating response: {e}")
 
-    def _build_messages(self, request: MultimodalRequest) -> List[ChatCompletionMessageParam]:
+    async def stream_response(
+        self, request: MultimodalRequest
+    ) -> AsyncIterator[str]:
+        """Stream response from OpenAI multimodal model.
+
+        Args:
+            request: Multimodal request
+
+        Yields:
+            Chunks of response text
+
+        Raises:
+            openai.OpenAIError: If the request or the stream fails
+        """
+        try:
+            messages_task = asyncio.create_task(self._build_messages(request))
+            try:
+                await self._throttle(self._estimate_tokens(request))
+            except BaseException:
+                messages_task.cancel()
+                raise
+            messages = await messages_task
+
+            stream = await self.client.chat.completions.create(
+                model=request.model,
+                messages=messages,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+                stream=True,
+            )
+            self._on_success()
+
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except openai.RateLimitError:
+            self._on_rate_limited()
+            raise
+
+    async def submit_batch(self, requests: List[MultimodalRequest]) -> str:
+        """Submit requests as an OpenAI Batch API job.
+
+        Args:
+            requests: Multimodal requests to run in the batch
+
+        Returns:
+            Batch ID
+        """
+        lines = []
+        for index, request in enumerate(requests):
+            lines.append(json.dumps({
+                "custom_id": f"request-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": request.model,
+                    "messages": await self._build_messages(request),
+                    "max_tokens": request.max_tokens,
+                    "temperature": request.temperature,
+                },
+            }))
+
+        try:
+            batch_file = await self.client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            batch = await self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+        except openai.APIError as e:
+            raise Exception(f"OpenAI API error: {e}")
+
+        return batch.id
+
+    async def retrieve_batch(self, batch_id: str) -> Tuple[str, List[MultimodalResponse]]:
+        """Retrieve the status and results of a Batch API job.
+
+        Args:
+            batch_id: Batch ID returned by submit_batch
+
+        Returns:
+            Batch status and the responses in submission order; responses are
+            empty until the batch has completed
+        """
+        try:
+            batch = await self.client.batches.retrieve(batch_id)
+            if batch.status != "completed":
+                return batch.status, []
+
+            results: Dict[int, MultimodalResponse] = {}
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                content = await self.client.files.content(file_id)
+                for line in content.text.splitlines():
+                    if line.strip():
+                        index, response = self._parse_batch_line(json.loads(line))
+                        results[index] = response
+        except openai.APIError as e:
+            raise Exception(f"OpenAI API error: {e}")
+
+        # One slot per submitted request, so a missing result can't shift later ones
+        total = batch.request_counts.total if batch.request_counts else 0
+        total = max(total, max(results, default=-1) + 1)
+        return batch.status, [
+            results.get(index)
+            or MultimodalResponse(model="", error=f"OpenAI batch error: no result for request-{index}")
+            for index in range(total)
+        ]
+
+    def _parse_batch_line(self, line: Dict[str, Any]) -> Tuple[int, MultimodalResponse]:
+        """Parse one line of a Batch API output or error file.
+
+        Args:
+            line: Decoded JSONL line
+
+        Returns:
+            Request index and its multimodal response
+        """
+        index = int(line["custom_id"].rsplit("-", 1)[1])
+        response = line.get("response") or {}
+
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or response.get("body", {}).get("error")
+            return index, MultimodalResponse(model="", error=f"OpenAI batch error: {error}")
+
+        return index, self._parse_response(ChatCompletion.model_validate(response["body"]))
+
+    @staticmethod
+    def _estimate_tokens(request: MultimodalRequest) -> int:
+        """Estimate the token cost of a request for rate limiting.
+
+        Args:
+            request: Multimodal request
+
+        Returns:
+            Approximate prompt tokens (4 characters per token) plus max_tokens
+        """
+        chars = len(request.system_prompt or "")
+        chars += sum(len(text_content.text) for text_content in request.text_contents)
+        chars += sum(len(file_content.text or "") for file_content in request.file_contents)
+        return chars // 4 + (request.max_tokens or 0)
+
+    def _refill(self) -> None:
+        """Refill the rate-limit buckets for the time elapsed since last refill."""
+        now = monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._rpm_bucket = min(self._rpm_limit, self._rpm_bucket + elapsed * self._rpm_limit / 60)
+        self._tpm_bucket = min(self._tpm_limit, self._tpm_bucket + elapsed * self._tpm_limit / 60)
+
+    async def _throttle(self, tokens: int) -> None:
+        """Wait until the request and token buckets have capacity, then consume it.
+
+        Args:
+            tokens: Estimated token cost of the request
+        """
+        if not self._rpm_limit and not self._tpm_limit:
+            return
+
+        async with self._lock:
+            while True:
+                self._refill()
+                # A single request larger than the whole bucket waits for a full bucket
+                token_cost = min(tokens, self._tpm_limit)
+                waits = []
+                if self._rpm_limit and self._rpm_bucket < 1:
+                    waits.append((1 - self._rpm_bucket) * 60 / self._rpm_limit)
+                if self._tpm_limit and self._tpm_bucket < token_cost:
+                    waits.append((token_cost - self._tpm_bucket) * 60 / self._tpm_limit)
+
+                if not waits:
+                    if self._rpm_limit:
+                        self._rpm_bucket -= 1
+                    if self._tpm_limit:
+                        self._tpm_bucket -= token_cost
+                    return
+
+                await sleep(max(waits))
+
+    def _on_success(self) -> None:
+        """Additively raise throttled limits back towards the configured ones."""
+        if self.max_requests_per_minute:
+            self._rpm_limit = min(float(self.max_requests_per_minute), self._rpm_limit + 1)
+        if self.max_tokens_per_minute:
+            self._tpm_limit = min(
+                float(self.max_tokens_per_minute),
+                self._tpm_limit + self.max_tokens_per_minute / 100,
+            )
+
+    def _on_rate_limited(self) -> None:
+        """Multiplicatively cut the limits after the API rejects a request with 429."""
+        if self._rpm_limit:
+            self._rpm_limit = max(1.0, self._rpm_limit / 2)
+            self._rpm_bucket = min(self._rpm_bucket, self._rpm_limit)
+        if self._tpm_limit:
+            self._tpm_limit = max(1.0, self._tpm_limit / 2)
+            self._tpm_bucket = min(self._tpm_bucket, self._tpm_limit)
+
+    async def _build_messages(self, request: MultimodalRequest) -> List[ChatCompletionMessageParam]:
         """Build OpenAI messages from multimodal request.
 
         Args:
@@ -81,32 +410,41 @@ class OpenAIProvider:
         if request.system_prompt:
             messages.append({"role": "system", "content": request.system_prompt})
 
-        # Build user message with multimodal content
-        content: List[Dict[str, Any]] = []
+        # Start reading and encoding images and text files (text only for OpenAI) concurrently
+        image_tasks = [
+            asyncio.create_task(self._prepare_image(image_content))
+            for image_content in request.image_contents
+        ]
+        file_tasks = [
+            asyncio.create_task(self._prepare_text_file(file_content))
+            for file_content in request.file_contents
+            if file_content.mime_type.startswith("text/")
+        ]
 
-        # Add text content
-        for text_content in request.text_contents:
-            content.append({"type": "text", "text": text_content.text})
+        # Build user message with multimodal content, starting with text content
+        content: List[Dict[str, Any]] = [
+            {"type": "text", "text": text_content.text}
+            for text_content in request.text_contents
+        ]
 
-        # Add image content
-        for image_content in request.image_contents:
-            image_data = self._prepare_image(image_content)
-            content.append({
-                "type": "image_url",
-                "image_url": image_data
-            })
+        try:
+            image_parts, file_parts = await asyncio.gather(
+                asyncio.gather(*image_tasks), asyncio.gather(*file_tasks)
+            )
+        except BaseException:
+            for task in image_tasks + file_tasks:
+                task.cancel()
+            raise
 
-        # Add file content (text files only for OpenAI)
-        for file_content in request.file_contents:
-            if file_content.mime_type.startswith("text/"):
-                text_data = self._prepare_text_file(file_content)
-                content.append({"type": "text", "text": text_data})
+        # Add image and file content in request order
+        content.extend({"type": "image_url", "image_url": image_data} for image_data in image_parts)
+        content.extend({"type": "text", "text": text_data} for text_data in file_parts)
 
         messages.append({"role": "user", "content": content})
 
         return messages
 
-    def _prepare_image(self, image_content: ImageContent) -> Dict[str, str]:
+    async def _prepare_image(self, image_content: ImageContent) -> Dict[str, str]:
         """Prepare image data for OpenAI API.
 
         Args:
@@ -118,7 +456,7 @@ class OpenAIProvider:
         if image_content.url:
             return {"url": image_content.url}
         elif image_content.image_path:
-            return self._encode_image_from_path(image_content.image_path)
+            return await self._encode_image_from_path(image_content.image_path)
         elif image_content.base64_data:
             return {
                 "url": f"data:{image_content.mime_type};base64,{image_content.base64_data}"
@@ -126,7 +464,7 @@ class OpenAIProvider:
         else:
             raise ValueError("No valid image source provided")
 
-    def _encode_image_from_path(self, image_path: str) -> Dict[str, str]:
+    async def _encode_image_from_path(self, image_path: str) -> Dict[str, str]:
         """Encode image from file path to base64.
 
         Args:
@@ -136,19 +474,58 @@ class OpenAIProvider:
             Dictionary with base64 image data
         """
         path = Path(image_path)
-        if not path.exists():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Image file not found: {image_path}")
 
-        mime_type, _ = mimetypes.guess_type(image_path)
+        mime_type = guess_mime(image_path)
         if not mime_type or not mime_type.startswith("image/"):
             raise ValueError(f"Invalid image file: {image_path}")
 
-        with open(path, "rb") as image_file:
-            base64_data = base64.b64encode(image_file.read()).decode("utf-8")
+        cache_key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        cached_url = self._image_cache.get(cache_key)
+        if cached_url is not None:
+            self._image_cache.move_to_end(cache_key)
+            return {"url": cached_url}
+
+        async with aiofiles.open(path, "rb") as image_file:
+            raw = await image_file.read()
 
-        return {"url": f"data:{mime_type};base64,{base64_data}"}
+        # Encoding is CPU-bound, so keep it off the event loop
+        base64_data = await asyncio.to_thread(_b64encode, raw)
 
-    def _prepare_text_file(self, file_content: FileContent) -> str:
+        data_url = b"".join((b"data:", mime_type.encode("ascii"), b";base64,", base64_data))
+        url = data_url.decode("ascii")
+
+        self._cache_image(cache_key, url)
+        return {"url": url}
+
+    def _cache_image(self, cache_key: Tuple[str, int, int], url: str) -> None:
+        """Store an encoded image, evicting least recently used entries.
+
+        Args:
+            cache_key: Absolute path, mtime and size of the image file
+            url: Encoded data URL
+        """
+        if len(url) > _IMAGE_CACHE_MAX_BYTES:
+            return
+
+        previous = self._image_cache.pop(cache_key, None)
+        if previous is not None:
+            self._image_cache_bytes -= len(previous)
+
+        self._image_cache[cache_key] = url
+        self._image_cache_bytes += len(url)
+
+        while (
+            len(self._image_cache) > _IMAGE_CACHE_MAX_ENTRIES
+            or self._image_cache_bytes > _IMAGE_CACHE_MAX_BYTES
+        ):
+            _, evicted = self._image_cache.popitem(last=False)
+            self._image_cache_bytes -= len(evicted)
+
+    async def _prepare_text_file(self, file_content: FileContent) -> str:
         """Prepare text file content for OpenAI API.
 
         Args:
@@ -160,12 +537,10 @@ class OpenAIProvider:
         if file_content.text:
             return f"File: {file_content.filename}\n{file_content.text}"
         elif file_content.file_path:
-            path = Path(file_content.file_path)
-            if not path.exists():
+            try:
+                content = await read_text_file(file_content.file_path)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"File not found: {file_content.file_path}")
-
-            with open(path, "r", encoding="utf-8") as file:
-                content = file.read()
             return f"File: {file_content.filename}\n{content}"
         else:
             raise ValueError("No valid text file source provided")
@@ -202,9 +577,9 @@ class OpenAIProvider:
         Returns:
             True if model is supported
         """
-        return model in self.supported_models
+        return model in self._supported_set
 
-    async def validate_request(self, request: MultimodalRequest) -> bool:
+    def validate_request(self, request: MultimodalRequest) -> bool:
         """Validate multimodal request.
 
         Args:
@@ -217,18 +592,11 @@ class OpenAIProvider:
             return False
 
         # Check image count (OpenAI has limits)
-        total_images = len(request.image_contents)
-        if total_images > 5:  # OpenAI typically limits to 5 images
+        if len(request.image_contents) > self._MAX_IMAGES:
             return False
 
-        # Validate image formats
-        for image_content in request.image_contents:
-            if image_content.mime_type not in [
-                "image/jpeg",
-                "image/png",
-                "image/gif",
-                "image/webp"
-            ]:
-                return False
-
-        return True
\ No newline at end of file
+        # Validate image formats, stopping at the first unsupported one
+        return not any(
+            image_content.mime_type not in _ALLOWED_IMAGE_MIMES
+            for image_content in request.image_contents
+        )
\ No newline at end of file
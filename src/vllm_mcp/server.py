@@ -5,15 +5,24 @@ import json
 import logging
 import os
 import sys
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Sequence
 from pathlib import Path
+from types import ModuleType
 
 import mcp.server.stdio
 import mcp.types as types
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.models import InitializationOptions
 from mcp.server.lowlevel import NotificationOptions, Server
 
+orjson: Optional[ModuleType]
+try:
+    # Rust-backed JSON codec; the stdlib json module is used when it isn't installed
+    import orjson
+except ImportError:
+    orjson = None
+
 from .models import (
     MultimodalRequest,
     MultimodalResponse,
@@ -24,6 +33,7 @@ from .models import (
     MCPToolResult,
 )
 from .providers import OpenAIProvider, DashscopeProvider
+from .utils import guess_mime, read_text_file
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +42,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default model name prefix -> provider used when a tool call doesn't name a provider;
+# the "model_prefixes" config key adds to or overrides these
+_MODEL_PREFIX_PROVIDERS: Dict[str, str] = {
+    "gpt": "openai",
+    "qwen": "dashscope",
+}
+
+
+def _json_dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """Serialize an object to a JSON string.
+
+    Args:
+        obj: Object to serialize
+        indent: JSON indentation, or None for compact output
+
+    Returns:
+        JSON string
+    """
+    if orjson is not None and indent in (None, 2):
+        dumped: bytes = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        return dumped.decode()
+    if indent is None:
+        return json.dumps(obj, separators=(",", ":"))
+    return json.dumps(obj, indent=indent)
+
+
+def _json_loads(data: bytes) -> Any:
+    """Deserialize a JSON document.
+
+    Args:
+        data: Raw JSON bytes
+
+    Returns:
+        Deserialized object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _parse_model_list(value: str) -> List[str]:
+    """Parse a comma-separated model list, dropping blank entries.
+
+    Args:
+        value: Comma-separated model names
+
+    Returns:
+        List of model names
+    """
+    return [model for model in map(str.strip, value.split(",")) if model]
+
 
 class MultimodalMCPServer:
     """MCP server for multimodal model interactions."""
@@ -43,7 +104,22 @@ class MultimodalMCPServer:
             config_path: Path to configuration file
         """
         self.config = self._load_config(config_path)
+        self._provider_configs: Dict[str, Dict[str, Any]] = {
+            config["provider_type"]: config
+            for config in self.config.get("providers", [])
+            if "provider_type" in config
+        }
         self.providers = self._initialize_providers()
+        self._model_prefix_map: Dict[str, str] = {
+            prefix.lower(): provider
+            for prefix, provider in {
+                **_MODEL_PREFIX_PROVIDERS,
+                **self.config.get("model_prefixes", {}),
+            }.items()
+        }
+        # Config and providers are fixed for the server's lifetime, so the
+        # serialized listing is built once per indent setting
+        self._providers_info_json = lru_cache(maxsize=4)(self._build_providers_info_json)
         self.server = FastMCP("vllm-mcp")
         self._setup_tools()
 
@@ -57,12 +133,12 @@ class MultimodalMCPServer:
             Configuration dictionary
         """
         if config_path and Path(config_path).exists():
-            with open(config_path, 'r') as f:
-                return json.load(f)
+            with open(config_path, 'rb') as f:
+                return _json_loads(f.read())
 
         # Parse supported models from environment variables
-        openai_models = os.getenv("OPENAI_SUPPORTED_MODELS", "gpt-4o,gpt-4o-mini,gpt-4-turbo,gpt-4-vision-preview").split(",")
-        dashscope_models = os.getenv("DASHSCOPE_SUPPORTED_MODELS", "qwen-vl-plus,qwen-vl-max,qwen-vl-chat,qwen2-vl-7b-instruct,qwen2-vl-72b-instruct").split(",")
+        openai_models = _parse_model_list(os.getenv("OPENAI_SUPPORTED_MODELS", "gpt-4o,gpt-4o-mini,gpt-4-turbo,gpt-4-vision-preview"))
+        dashscope_models = _parse_model_list(os.getenv("DASHSCOPE_SUPPORTED_MODELS", "qwen-vl-plus,qwen-vl-max,qwen-vl-chat,qwen2-vl-7b-instruct,qwen2-vl-72b-instruct"))
 
         # Default configuration
         return {
@@ -78,7 +154,7 @@ class MultimodalMCPServer:
                     "api_key": os.getenv("OPENAI_API_KEY", ""),
                     "base_url": os.getenv("OPENAI_BASE_URL"),
                     "default_model": os.getenv("OPENAI_DEFAULT_MODEL", "gpt-4o"),
-                    "supported_models": [model.strip() for model in openai_models],
+                    "supported_models": openai_models,
                     "max_tokens": 4000,
                     "temperature": 0.7
                 },
@@ -86,7 +162,7 @@ class MultimodalMCPServer:
                     "provider_type": "dashscope",
                     "api_key": os.getenv("DASHSCOPE_API_KEY", ""),
                     "default_model": os.getenv("DASHSCOPE_DEFAULT_MODEL", "qwen-vl-plus"),
-                    "supported_models": [model.strip() for model in dashscope_models],
+                    "supported_models": dashscope_models,
                     "max_tokens": 4000,
                     "temperature": 0.7
                 }
@@ -109,7 +185,9 @@ class MultimodalMCPServer:
                     providers["openai"] = OpenAIProvider(
                         api_key=provider_config["api_key"],
                         base_url=provider_config.get("base_url"),
-                        supported_models=provider_config.get("supported_models")
+                        supported_models=provider_config.get("supported_models"),
+                        max_requests_per_minute=provider_config.get("max_requests_per_minute"),
+                        max_tokens_per_minute=provider_config.get("max_tokens_per_minute")
                     )
                     default_model = provider_config.get("default_model", "gpt-4o")
                     logger.info(f"Initialized OpenAI provider with default model: {default_model}")
@@ -118,18 +196,229 @@ class MultimodalMCPServer:
                 if provider_config.get("api_key"):
                     providers["dashscope"] = DashscopeProvider(
                         api_key=provider_config["api_key"],
-                        supported_models=provider_config.get("supported_models")
+                        supported_models=provider_config.get("supported_models"),
+                        strict_validate=provider_config.get("strict_validate", True)
                     )
                     default_model = provider_config.get("default_model", "qwen-vl-plus")
                     logger.info(f"Initialized Dashscope provider with default model: {default_model}")
 
         return providers
 
+    def _build_providers_info_json(self, indent: Optional[int] = 2) -> str:
+        """Serialize the listing of all initialized providers.
+
+        Args:
+            indent: JSON indentation, or None for compact output
+
+        Returns:
+            JSON string of available providers and their models
+        """
+        providers_info = {}
+
+        for provider_name in self.providers:
+            provider_info = self._build_provider_info(provider_name)
+            if provider_info is not None:
+                providers_info[provider_name] = provider_info
+
+        return _json_dumps(providers_info, indent=indent)
+
+    def _build_provider_info(self, provider_name: str) -> Optional[Dict[str, Any]]:
+        """Build the listing entry for a provider.
+
+        Args:
+            provider_name: Name of an initialized provider
+
+        Returns:
+            Provider information dictionary, or None for unknown provider types
+        """
+        provider = self.providers[provider_name]
+
+        # Find the provider config to get default model
+        provider_config = self._provider_configs.get(provider_name)
+
+        if isinstance(provider, OpenAIProvider):
+            return {
+                "type": "openai",
+                "default_model": provider_config.get("default_model", "gpt-4o") if provider_config else "gpt-4o",
+                "supported_models": provider.supported_models,
+                "max_tokens": provider_config.get("max_tokens", 4000) if provider_config else 4000,
+                "temperature": provider_config.get("temperature", 0.7) if provider_config else 0.7
+            }
+        elif isinstance(provider, DashscopeProvider):
+            return {
+                "type": "dashscope",
+                "default_model": provider_config.get("default_model", "qwen-vl-plus") if provider_config else "qwen-vl-plus",
+                "supported_models": provider.supported_models,
+                "max_tokens": provider_config.get("max_tokens", 4000) if provider_config else 4000,
+                "temperature": provider_config.get("temperature", 0.7) if provider_config else 0.7
+            }
+
+        return None
+
+    async def _build_request(
+        self,
+        model: str,
+        prompt: str,
+        image_urls: Optional[List[str]] = None,
+        file_paths: Optional[List[str]] = None,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = 1000,
+        temperature: Optional[float] = 0.7
+    ) -> MultimodalRequest:
+        """Build a multimodal request from tool arguments.
+
+        Args:
+            model: Model name to use
+            prompt: Text prompt
+            image_urls: Optional list of image URLs
+            file_paths: Optional list of file paths
+            system_prompt: Optional system prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Generation temperature
+
+        Returns:
+            Multimodal request
+        """
+        text_contents = [TextContent(text=prompt)]
+        image_contents = []
+        file_contents = []
+
+        # Add image content
+        if image_urls:
+            for url in image_urls:
+                image_contents.append(ImageContent(
+                    url=url,
+                    mime_type="image/jpeg"  # Default, will be updated if needed
+                ))
+
+        # Add file content
+        if file_paths:
+            for file_path in file_paths:
+                # Missing files are skipped; text files are opened directly instead of stat'd first
+                mime_type = guess_mime(file_path)
+
+                if mime_type and mime_type.startswith("image/"):
+                    if os.path.exists(file_path):
+                        image_contents.append(ImageContent(
+                            image_path=file_path,
+                            mime_type=mime_type
+                        ))
+                elif mime_type and mime_type.startswith("text/"):
+                    path = Path(file_path)
+                    try:
+                        content = await read_text_file(path)
+                    except FileNotFoundError:
+                        continue
+                    file_contents.append(FileContent(
+                        filename=path.name,
+                        text=content,
+                        mime_type=mime_type
+                    ))
+
+        return MultimodalRequest(
+            model=model,
+            text_contents=text_contents,
+            image_contents=image_contents,
+            file_contents=file_contents,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+
+    def _detect_provider(self, model: str) -> Optional[str]:
+        """Pick a provider for a model from its name prefix.
+
+        The prefix is the model name up to the first "-" or ".", so "gpt-4o"
+        maps through "gpt"; a version suffix such as the "2" in "qwen2-vl" is
+        ignored if the full prefix is not registered. Names without a separator,
+        such as "gpt4o", fall back to the longest registered prefix they start with.
+
+        Args:
+            model: Model name
+
+        Returns:
+            Provider name, or the first configured provider if no prefix matches
+        """
+        name = model.lower()
+        prefix = name.split("-", 1)[0].split(".", 1)[0]
+        provider = (
+            self._model_prefix_map.get(prefix)
+            or self._model_prefix_map.get(prefix.rstrip("0123456789"))
+        )
+        if not provider:
+            longest = max(
+                (known for known in self._model_prefix_map if name.startswith(known)),
+                key=len,
+                default=None,
+            )
+            provider = self._model_prefix_map.get(longest) if longest else None
+        return provider or next(iter(self.providers), None)
+
+    async def _generate_response(
+        self,
+        model: str,
+        prompt: str,
+        image_urls: Optional[List[str]] = None,
+        file_paths: Optional[List[str]] = None,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = 1000,
+        temperature: Optional[float] = 0.7,
+        provider: Optional[str] = None
+    ) -> str:
+        """Build a multimodal request and generate its response text.
+
+        Args:
+            model: Model name to use
+            prompt: Text prompt
+            image_urls: Optional list of image URLs
+            file_paths: Optional list of file paths
+            system_prompt: Optional system prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Generation temperature
+            provider: Optional provider name (openai, dashscope)
+
+        Returns:
+            Generated response text, or an error message
+        """
+        try:
+            # Auto-detect provider if not specified
+            if not provider:
+                provider = self._detect_provider(model)
+
+            if not provider or provider not in self.providers:
+                return f"Error: Provider '{provider}' not available"
+
+            request = await self._build_request(
+                model=model,
+                prompt=prompt,
+                image_urls=image_urls,
+                file_paths=file_paths,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+
+            # Generate response
+            response = await self.providers[provider].generate_response(request)
+
+            if response.error:
+                return f"Error: {response.error}"
+
+            result = response.text
+            if response.usage:
+                result += f"\n\n[Token usage: {response.usage}]"
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return f"Error: {str(e)}"
+
     def _setup_tools(self):
         """Setup MCP tools."""
 
         @self.server.tool()
-        def generate_multimodal_response(
+        async def generate_multimodal_response(
             model: str,
             prompt: str,
             image_urls: Optional[List[str]] = None,
@@ -151,140 +440,185 @@ class MultimodalMCPServer:
                 temperature: Generation temperature
                 provider: Optional provider name (openai, dashscope)
 
+            Returns:
+                Generated response text
+            """
+            return await self._generate_response(
+                model=model,
+                prompt=prompt,
+                image_urls=image_urls,
+                file_paths=file_paths,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                provider=provider
+            )
+
+        @self.server.tool()
+        async def stream_multimodal_response(
+            ctx: Context,
+            model: str,
+            prompt: str,
+            image_urls: Optional[List[str]] = None,
+            file_paths: Optional[List[str]] = None,
+            system_prompt: Optional[str] = None,
+            max_tokens: Optional[int] = 1000,
+            temperature: Optional[float] = 0.7,
+            provider: Optional[str] = None
+        ) -> str:
+            """Stream response from multimodal model as progress notifications.
+
+            Each text chunk is sent as the message of a progress notification when
+            the client supplies a progress token; the full text is returned at the end.
+
+            Args:
+                ctx: FastMCP request context
+                model: Model name to use
+                prompt: Text prompt
+                image_urls: Optional list of image URLs
+                file_paths: Optional list of file paths
+                system_prompt: Optional system prompt
+                max_tokens: Maximum tokens to generate
+                temperature: Generation temperature
+                provider: Optional provider name (openai, dashscope)
+
             Returns:
                 Generated response text
             """
             try:
                 # Auto-detect provider if not specified
                 if not provider:
-                    if model.startswith("gpt"):
-                        provider = "openai"
-                    elif model.startswith("qwen"):
-                        provider = "dashscope"
-                    else:
-                        provider = list(self.providers.keys())[0] if self.providers else None
+                    provider = self._detect_provider(model)
 
                 if not provider or provider not in self.providers:
                     return f"Error: Provider '{provider}' not available"
 
-                # Build multimodal request
-                text_contents = [TextContent(text=prompt)]
-                image_contents = []
-                file_contents = []
-
-                # Add image content
-                if image_urls:
-                    for url in image_urls:
-                        image_contents.append(ImageContent(
-                            url=url,
-                            mime_type="image/jpeg"  # Default, will be updated if needed
-                        ))
-
-                # Add file content
-                if file_paths:
-                    for file_path in file_paths:
-                        path = Path(file_path)
-                        if path.exists():
-                            import mimetypes
-                            mime_type, _ = mimetypes.guess_type(file_path)
-
-                            if mime_type and mime_type.startswith("image/"):
-                                image_contents.append(ImageContent(
-                                    image_path=file_path,
-                                    mime_type=mime_type
-                                ))
-                            elif mime_type and mime_type.startswith("text/"):
-                                with open(path, 'r', encoding='utf-8') as f:
-                                    content = f.read()
-                                file_contents.append(FileContent(
-                                    filename=path.name,
-                                    text=content,
-                                    mime_type=mime_type
-                                ))
-
-                request = MultimodalRequest(
+                request = await self._build_request(
                     model=model,
-                    text_contents=text_contents,
-                    image_contents=image_contents,
-                    file_contents=file_contents,
+                    prompt=prompt,
+                    image_urls=image_urls,
+                    file_paths=file_paths,
                     system_prompt=system_prompt,
                     max_tokens=max_tokens,
                     temperature=temperature
                 )
 
-                # Generate response
-                try:
-                    # Check if we're already in an event loop
-                    try:
-                        loop = asyncio.get_running_loop()
-                        # We're already in a loop, create a task
-                        task = asyncio.create_task(
-                            self.providers[provider].generate_response(request)
-                        )
-                        # Wait for the task to complete
-                        while not task.done():
-                            asyncio.sleep(0.01)
-                        response = task.result()
-                    except RuntimeError:
-                        # No running loop, create a new one
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        response = loop.run_until_complete(
-                            self.providers[provider].generate_response(request)
-                        )
-                        loop.close()
-
-                    if response.error:
-                        return f"Error: {response.error}"
-
-                    result = response.text
-                    if response.usage:
-                        result += f"\n\n[Token usage: {response.usage}]"
-
-                    return result
-
-                finally:
-                    loop.close()
+                chunks: List[str] = []
+                async for chunk in self.providers[provider].stream_response(request):
+                    chunks.append(chunk)
+                    await ctx.report_progress(len(chunks), message=chunk)
+
+                return "".join(chunks)
 
             except Exception as e:
-                logger.error(f"Error generating response: {e}")
+                logger.error(f"Error streaming response: {e}")
                 return f"Error: {str(e)}"
 
         @self.server.tool()
-        def list_available_providers() -> str:
+        async def generate_multimodal_batch(
+            requests: List[Dict[str, Any]],
+            max_concurrent: int = 50
+        ) -> str:
+            """Generate responses for several multimodal requests concurrently.
+
+            Args:
+                requests: List of requests, each with the same fields as
+                    generate_multimodal_response (model, prompt, image_urls, ...)
+                max_concurrent: Maximum number of requests in flight at once
+
+            Returns:
+                JSON list of response texts, in request order
+            """
+            semaphore = asyncio.Semaphore(max(1, max_concurrent))
+
+            async def run(item: Dict[str, Any]) -> str:
+                async with semaphore:
+                    return await self._generate_response(**item)
+
+            results = await asyncio.gather(
+                *(run(item) for item in requests), return_exceptions=True
+            )
+
+            return _json_dumps([
+                f"Error: {result}" if isinstance(result, BaseException) else result
+                for result in results
+            ], indent=2)
+
+        @self.server.tool()
+        async def submit_batch(requests: List[Dict[str, Any]]) -> str:
+            """Submit requests to the OpenAI Batch API for offline processing.
+
+            Args:
+                requests: List of requests, each with the same fields as
+                    generate_multimodal_response; provider may only be openai
+
+            Returns:
+                Batch ID to pass to poll_batch
+            """
+            if "openai" not in self.providers:
+                return "Error: Provider 'openai' not available"
+
+            openai_provider = self.providers["openai"]
+            try:
+                batch_requests = []
+                for index, item in enumerate(requests):
+                    # Batches always go to OpenAI; accept the field only if it agrees
+                    item = dict(item)
+                    item_provider = item.pop("provider", None)
+                    if item_provider and item_provider != "openai":
+                        return f"Error: Request {index}: provider '{item_provider}' does not support batches"
+
+                    model = item.get("model", "")
+                    if not openai_provider.is_model_supported(model):
+                        return f"Error: Request {index}: model '{model}' not supported by provider 'openai'"
+
+                    batch_requests.append(await self._build_request(**item))
+
+                batch_id: str = await openai_provider.submit_batch(batch_requests)
+                return batch_id
+            except Exception as e:
+                logger.error(f"Error submitting batch: {e}")
+                return f"Error: {str(e)}"
+
+        @self.server.tool()
+        async def poll_batch(batch_id: str) -> str:
+            """Poll an OpenAI Batch API job and return its results when done.
+
+            Args:
+                batch_id: Batch ID returned by submit_batch
+
+            Returns:
+                JSON object with the batch status and, once completed, the
+                response texts in request order
+            """
+            if "openai" not in self.providers:
+                return "Error: Provider 'openai' not available"
+
+            try:
+                status, responses = await self.providers["openai"].retrieve_batch(batch_id)
+            except Exception as e:
+                logger.error(f"Error polling batch: {e}")
+                return f"Error: {str(e)}"
+
+            return _json_dumps({
+                "status": status,
+                "results": [
+                    f"Error: {response.error}" if response.error else response.text
+                    for response in responses
+                ],
+            }, indent=2)
+
+        @self.server.tool()
+        def list_available_providers(indent: Optional[int] = 2) -> str:
             """List available model providers and their configurations.
 
+            Args:
+                indent: JSON indentation, or None for compact output
+
             Returns:
                 JSON string of available providers and their models
             """
-            providers_info = {}
-
-            for provider_name, provider in self.providers.items():
-                # Find the provider config to get default model
-                provider_config = None
-                for config in self.config.get("providers", []):
-                    if config.get("provider_type") == provider_name:
-                        provider_config = config
-                        break
-
-                if isinstance(provider, OpenAIProvider):
-                    providers_info[provider_name] = {
-                        "type": "openai",
-                        "default_model": provider_config.get("default_model", "gpt-4o") if provider_config else "gpt-4o",
-                        "supported_models": provider.supported_models,
-                        "max_tokens": provider_config.get("max_tokens", 4000) if provider_config else 4000,
-                        "temperature": provider_config.get("temperature", 0.7) if provider_config else 0.7
-                    }
-                elif isinstance(provider, DashscopeProvider):
-                    providers_info[provider_name] = {
-                        "type": "dashscope",
-                        "default_model": provider_config.get("default_model", "qwen-vl-plus") if provider_config else "qwen-vl-plus",
-                        "supported_models": provider.supported_models,
-                        "max_tokens": provider_config.get("max_tokens", 4000) if provider_config else 4000,
-                        "temperature": provider_config.get("temperature", 0.7) if provider_config else 0.7
-                    }
-
-            return json.dumps(providers_info, indent=2)
+            return self._providers_info_json(indent)
 
         @self.server.tool()
         def validate_multimodal_request(
@@ -307,12 +641,7 @@ class MultimodalMCPServer:
             try:
                 # Auto-detect provider if not specified
                 if not provider:
-                    if model.startswith("gpt"):
-                        provider = "openai"
-                    elif model.startswith("qwen"):
-                        provider = "dashscope"
-                    else:
-                        provider = list(self.providers.keys())[0] if self.providers else None
+                    provider = self._detect_provider(model)
 
                 if not provider or provider not in self.providers:
                     return f"Error: Provider '{provider}' not available"
@@ -331,34 +660,12 @@ class MultimodalMCPServer:
                     ]
                 )
 
-                try:
-                    # Check if we're already in an event loop
-                    try:
-                        loop = asyncio.get_running_loop()
-                        # We're already in a loop, create a task
-                        task = asyncio.create_task(
-                            self.providers[provider].validate_request(request)
-                        )
-                        # Wait for the task to complete
-                        while not task.done():
-                            asyncio.sleep(0.01)
-                        is_valid = task.result()
-                    except RuntimeError:
-                        # No running loop, create a new one
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        is_valid = loop.run_until_complete(
-                            self.providers[provider].validate_request(request)
-                        )
-                        loop.close()
-
-                    if is_valid:
-                        return f"Request is valid for provider '{provider}'"
-                    else:
-                        return f"Request is invalid for provider '{provider}'"
-
-                finally:
-                    loop.close()
+                is_valid = self.providers[provider].validate_request(request)
+
+                if is_valid:
+                    return f"Request is valid for provider '{provider}'"
+                else:
+                    return f"Request is invalid for provider '{provider}'"
 
             except Exception as e:
                 return f"Error validating request: {str(e)}"
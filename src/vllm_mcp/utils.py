@@ -0,0 +1,71 @@
+"""File helpers shared by the server and providers."""
+
+import mimetypes
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Union
+
+import aiofiles
+
+# Load the system MIME tables once at import instead of lazily on the first guess
+mimetypes.init()
+
+# Common image types, answered without consulting the system MIME tables
+_IMAGE_MIME_TYPES: Dict[str, str] = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+}
+
+# Maximum number of bytes read from a text file attachment
+MAX_TEXT_BYTES = 1 << 20
+
+
+@lru_cache(maxsize=1024)
+def _guess_mime_for_ext(ext: str) -> Optional[str]:
+    """Guess a MIME type for a lowercase file extension, memoized per extension.
+
+    Args:
+        ext: Lowercase extension including the leading dot
+
+    Returns:
+        MIME type, or None if it cannot be guessed
+    """
+    return _IMAGE_MIME_TYPES.get(ext) or mimetypes.guess_type(f"file{ext}")[0]
+
+
+def guess_mime(path: str) -> Optional[str]:
+    """Guess a MIME type from a file path's extension.
+
+    Args:
+        path: File path or name
+
+    Returns:
+        MIME type, or None if it cannot be guessed
+    """
+    return _guess_mime_for_ext(os.path.splitext(path)[1].lower())
+
+
+async def read_text_file(path: Union[str, os.PathLike]) -> str:
+    """Read a text attachment, capped at MAX_TEXT_BYTES and decoded as lenient UTF-8.
+
+    Args:
+        path: Path to text file
+
+    Returns:
+        File text, ending with a truncation marker if the file was cut off
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    async with aiofiles.open(path, "rb") as file:
+        # One extra byte tells a file of exactly MAX_TEXT_BYTES from a longer one
+        raw: bytes = await file.read(MAX_TEXT_BYTES + 1)
+
+    text = raw[:MAX_TEXT_BYTES].decode("utf-8", errors="replace")
+    if len(raw) > MAX_TEXT_BYTES:
+        text += f"\n[... file truncated after {MAX_TEXT_BYTES} bytes]"
+    return text
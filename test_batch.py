@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Unit tests for OpenAI Batch API submission and result parsing.
+"""
+
+import json
+
+import pytest
+
+from vllm_mcp.providers.openai_provider import OpenAIProvider
+from vllm_mcp.server import MultimodalMCPServer
+
+
+def test_parse_batch_line():
+    """Batch output lines map back to their request index, errors included."""
+    provider = OpenAIProvider(api_key="test")
+    ok_line = {
+        "custom_id": "request-3",
+        "response": {
+            "status_code": 200,
+            "body": {
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o",
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "hello"},
+                }],
+            },
+        },
+    }
+    error_line = {
+        "custom_id": "request-12",
+        "response": {"status_code": 400, "body": {"error": {"message": "bad"}}},
+    }
+
+    index, response = provider._parse_batch_line(ok_line)
+    assert index == 3
+    assert response.text == "hello"
+
+    index, response = provider._parse_batch_line(error_line)
+    assert index == 12
+    assert response.error and "bad" in response.error
+
+
+@pytest.fixture
+def submitted(tmp_path):
+    """Server with an OpenAI provider whose upload just records the requests."""
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({
+        "providers": [{"provider_type": "openai", "api_key": "test"}],
+    }))
+    server = MultimodalMCPServer(str(config_path))
+    uploads = []
+
+    async def submit_batch(requests):
+        uploads.append(requests)
+        return "batch-1"
+
+    server.providers["openai"].submit_batch = submit_batch
+    tool = server.server._tool_manager._tools["submit_batch"].fn
+    return tool, uploads
+
+
+@pytest.mark.asyncio
+async def test_submit_batch_accepts_openai_provider_field(submitted):
+    """An explicit provider of openai is allowed and not passed on."""
+    tool, uploads = submitted
+
+    result = await tool([
+        {"model": "gpt-4o", "prompt": "a", "provider": "openai"},
+        {"model": "gpt-4o-mini", "prompt": "b"},
+    ])
+
+    assert result == "batch-1"
+    assert [request.model for request in uploads[0]] == ["gpt-4o", "gpt-4o-mini"]
+
+
+@pytest.mark.parametrize("item", [
+    {"model": "gpt-4o", "prompt": "a", "provider": "dashscope"},
+    {"model": "qwen-vl-plus", "prompt": "a"},
+])
+@pytest.mark.asyncio
+async def test_submit_batch_rejects_non_openai_requests(submitted, item):
+    """Requests for another provider or model fail before anything is uploaded."""
+    tool, uploads = submitted
+
+    result = await tool([{"model": "gpt-4o", "prompt": "ok"}, item])
+
+    assert result.startswith("Error: Request 1:")
+    assert uploads == []
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Unit tests for picking a provider from the model name.
+"""
+
+import json
+
+import pytest
+
+from vllm_mcp.server import MultimodalMCPServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Server with no API keys, so no provider is initialized."""
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({
+        "providers": [
+            {"provider_type": "openai", "api_key": ""},
+            {"provider_type": "dashscope", "api_key": ""},
+        ],
+        "model_prefixes": {"Llama": "openai", "qwenlocal": "openai"},
+    }))
+    return MultimodalMCPServer(str(config_path))
+
+
+@pytest.mark.parametrize("model, provider", [
+    ("gpt-4o", "openai"),
+    ("GPT-4-turbo", "openai"),
+    ("qwen-vl-plus", "dashscope"),
+    ("qwen2.5-vl-72b", "dashscope"),
+    ("qwen2-vl-7b-instruct", "dashscope"),
+    ("llama-3.2-vision", "openai"),
+    ("gpt4o", "openai"),
+    ("qwenvl-max", "dashscope"),
+    ("qwenlocal7b", "openai"),
+])
+def test_detect_provider_by_prefix(server, model, provider):
+    """Known prefixes map to their provider, with or without a separator after them.
+
+    Without a separator the longest matching prefix wins, so "qwenlocal7b" is
+    not claimed by the built-in "qwen".
+    """
+    assert server._detect_provider(model) == provider
+
+
+def test_detect_provider_unknown_prefix(server):
+    """Unknown prefixes fall back to the first initialized provider, if any."""
+    assert server._detect_provider("mistral-large") is None
+
+    server.providers = {"dashscope": object(), "openai": object()}
+    assert server._detect_provider("mistral-large") == "dashscope"
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for OpenAI rate limiting.
+"""
+
+import pytest
+
+from vllm_mcp.models import MultimodalRequest, TextContent
+from vllm_mcp.providers import openai_provider
+from vllm_mcp.providers.openai_provider import OpenAIProvider
+
+
+class FakeClock:
+    """Monotonic clock that only advances when the throttle sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drive the throttle's time and sleep calls from a fake clock."""
+    fake = FakeClock()
+    monkeypatch.setattr(openai_provider, "monotonic", fake.monotonic)
+    monkeypatch.setattr(openai_provider, "sleep", fake.sleep)
+    return fake
+
+
+def _request(max_tokens=100):
+    return MultimodalRequest(
+        model="gpt-4o",
+        text_contents=[TextContent(text="")],
+        max_tokens=max_tokens,
+    )
+
+
+@pytest.mark.asyncio
+async def test_throttle_waits_for_request_bucket(clock):
+    """A full RPM bucket admits a burst, then spaces requests 60/RPM seconds apart."""
+    provider = OpenAIProvider(api_key="test", max_requests_per_minute=60)
+
+    for _ in range(60):
+        await provider._throttle(0)
+    assert clock.sleeps == []
+
+    await provider._throttle(0)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+@pytest.mark.asyncio
+async def test_throttle_waits_for_token_bucket(clock):
+    """Requests wait until the TPM bucket has refilled enough for their estimate."""
+    provider = OpenAIProvider(api_key="test", max_tokens_per_minute=600)
+    tokens = provider._estimate_tokens(_request(max_tokens=100))
+    assert tokens == 100
+
+    for _ in range(6):
+        await provider._throttle(tokens)
+    assert clock.sleeps == []
+
+    await provider._throttle(tokens)
+    assert clock.sleeps == [pytest.approx(10.0)]
+
+
+@pytest.mark.asyncio
+async def test_throttle_disabled_without_limits(clock):
+    """No configured limits means no waiting."""
+    provider = OpenAIProvider(api_key="test")
+
+    for _ in range(1000):
+        await provider._throttle(10_000)
+    assert clock.sleeps == []
+
+
+def test_rate_limited_halves_and_success_recovers(clock):
+    """A 429 halves the limits; successes raise them back to the configured ones."""
+    provider = OpenAIProvider(
+        api_key="test", max_requests_per_minute=100, max_tokens_per_minute=10_000
+    )
+
+    provider._on_rate_limited()
+    assert provider._rpm_limit == 50
+    assert provider._tpm_limit == 5_000
+    assert provider._rpm_bucket <= provider._rpm_limit
+    assert provider._tpm_bucket <= provider._tpm_limit
+
+    provider._on_rate_limited()
+    assert provider._rpm_limit == 25
+
+    provider._on_success()
+    assert provider._rpm_limit == 26
+    assert provider._tpm_limit == 2_600
+
+    for _ in range(200):
+        provider._on_success()
+    assert provider._rpm_limit == 100
+    assert provider._tpm_limit == 10_000
@@ -3,170 +3,208 @@
 Test script to verify VLLM MCP Server setup and configuration.
 """
 
+import functools
 import os
 import sys
 import json
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+_HAS_OPENAI = bool(os.environ.get("OPENAI_API_KEY"))
+_HAS_DASHSCOPE = bool(os.environ.get("DASHSCOPE_API_KEY"))
+
+# Set VLLM_MCP_TEST_VERBOSE=1 to print per-provider model details
+VERBOSE = os.environ.get("VLLM_MCP_TEST_VERBOSE") == "1"
+
+class Reporter:
+    """Collect test output and write it to stdout in one call."""
+
+    def __init__(self):
+        self._buf = []
+
+    def log(self, msg):
+        """Queue a line of output."""
+        self._buf.append(msg)
+
+    def flush(self):
+        """Write all queued lines and clear the buffer."""
+        if self._buf:
+            sys.stdout.write("\n".join(self._buf) + "\n")
+            self._buf.clear()
+
+_reporter = Reporter()
+
+_EXPECTED_TOOLS = frozenset({
+    "generate_multimodal_response",
+    "list_available_providers",
+    "validate_multimodal_request",
+})
+
+@functools.lru_cache(maxsize=1)
+def _get_server():
+    """Build the server once and share it across tests."""
+    from vllm_mcp.server import MultimodalMCPServer
+
+    return MultimodalMCPServer()
+
+@functools.lru_cache(maxsize=1)
+def _load_config(path="config.json"):
+    """Parse the configuration file once and share the result across tests."""
+    with open(path, "rb") as f:
+        return _loads(f.read())
 
 def test_imports():
     """Test if all modules can be imported."""
-    print("🔍 Testing imports...")
+    _reporter.log("🔍 Testing imports...")
 
     try:
         from vllm_mcp.models import MultimodalRequest, TextContent, ImageContent
         from vllm_mcp.providers.openai_provider import OpenAIProvider
         from vllm_mcp.providers.dashscope_provider import DashscopeProvider
         from vllm_mcp.server import MultimodalMCPServer
-        print("✅ All imports successful")
+        _reporter.log("✅ All imports successful")
         return True
     except ImportError as e:
-        print(f"❌ Import error: {e}")
+        _reporter.log(f"❌ Import error: {e}")
         return False
 
 def test_environment_variables():
     """Test if required environment variables are set."""
-    print("\n🔍 Testing environment variables...")
+    _reporter.log("\n🔍 Testing environment variables...")
 
-    has_openai = bool(os.getenv("OPENAI_API_KEY"))
-    has_dashscope = bool(os.getenv("DASHSCOPE_API_KEY"))
-
-    if has_openai:
-        print("✅ OpenAI API key is set")
+    if _HAS_OPENAI:
+        _reporter.log("✅ OpenAI API key is set")
     else:
-        print("⚠️  OpenAI API key is not set")
+        _reporter.log("⚠️  OpenAI API key is not set")
 
-    if has_dashscope:
-        print("✅ Dashscope API key is set")
+    if _HAS_DASHSCOPE:
+        _reporter.log("✅ Dashscope API key is set")
     else:
-        print("⚠️  Dashscope API key is not set")
+        _reporter.log("⚠️  Dashscope API key is not set")
 
-    if not has_openai and not has_dashscope:
-        print("❌ No API keys are configured. Please set at least one of:")
-        print("   - OPENAI_API_KEY")
-        print("   - DASHSCOPE_API_KEY")
+    if not _HAS_OPENAI and not _HAS_DASHSCOPE:
+        _reporter.log("❌ No API keys are configured. Please set at least one of:")
+        _reporter.log("   - OPENAI_API_KEY")
+        _reporter.log("   - DASHSCOPE_API_KEY")
         return False
 
     return True
 
 def test_config_file():
     """Test configuration file."""
-    print("\n🔍 Testing configuration file...")
+    _reporter.log("\n🔍 Testing configuration file...")
 
-    config_path = Path("config.json")
-    if not config_path.exists():
-        print("⚠️  config.json not found, using default configuration")
+    if not os.path.isfile("config.json"):
+        _reporter.log("⚠️  config.json not found, using default configuration")
         return True
 
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = _load_config()
 
         if "providers" in config:
-            print(f"✅ Configuration loaded with {len(config['providers'])} providers")
+            _reporter.log(f"✅ Configuration loaded with {len(config['providers'])} providers")
             return True
         else:
-            print("❌ Invalid configuration: no providers found")
+            _reporter.log("❌ Invalid configuration: no providers found")
             return False
 
     except json.JSONDecodeError as e:
-        print(f"❌ Configuration file JSON error: {e}")
+        _reporter.log(f"❌ Configuration file JSON error: {e}")
         return False
     except Exception as e:
-        print(f"❌ Configuration file error: {e}")
+        _reporter.log(f"❌ Configuration file error: {e}")
         return False
 
 def test_server_initialization():
     """Test server initialization."""
-    print("\n🔍 Testing server initialization...")
+    _reporter.log("\n🔍 Testing server initialization...")
 
     try:
-        from vllm_mcp.server import MultimodalMCPServer
-
         # Create server instance
-        server = MultimodalMCPServer()
+        server = _get_server()
 
         # Check if providers are initialized
         provider_count = len(server.providers)
-        print(f"✅ Server initialized with {provider_count} provider(s)")
+        _reporter.log(f"✅ Server initialized with {provider_count} provider(s)")
 
         if provider_count == 0:
-            print("⚠️  No providers available. Check API key configuration.")
+            _reporter.log("⚠️  No providers available. Check API key configuration.")
 
         return True
 
     except Exception as e:
-        print(f"❌ Server initialization error: {e}")
+        _reporter.log(f"❌ Server initialization error: {e}")
         return False
 
 def test_mcp_tools():
     """Test MCP tools registration."""
-    print("\n🔍 Testing MCP tools...")
+    _reporter.log("\n🔍 Testing MCP tools...")
 
     try:
-        from vllm_mcp.server import MultimodalMCPServer
-
-        server = MultimodalMCPServer()
-
-        # Check if tools are registered by inspecting the FastMCP instance
-        expected_tools = [
-            "generate_multimodal_response",
-            "list_available_providers",
-            "validate_multimodal_request"
-        ]
+        server = _get_server()
 
         # FastMCP stores tools differently, let's test by accessing the internal registry
         try:
             # Access the tool registry through internal attribute
             tools_registry = server.server._tools if hasattr(server.server, '_tools') else {}
-            tool_names = list(tools_registry.keys())
-        except:
+            registered = frozenset(tools_registry.keys())
+        except AttributeError:
             # If we can't access the internal registry, we'll assume tools are registered
             # since the server initialization succeeded
-            tool_names = expected_tools
+            registered = _EXPECTED_TOOLS
 
-        for tool in expected_tools:
-            if tool in tool_names or tool_names == expected_tools:
-                print(f"✅ Tool '{tool}' registered")
+        # Check if tools are registered by inspecting the FastMCP instance
+        for tool in sorted(_EXPECTED_TOOLS):
+            if tool in registered:
+                _reporter.log(f"✅ Tool '{tool}' registered")
             else:
-                print(f"⚠️  Tool '{tool}' registration not verifiable")
+                _reporter.log(f"⚠️  Tool '{tool}' registration not verifiable")
 
-        print("✅ MCP tools registration test completed")
+        _reporter.log("✅ MCP tools registration test completed")
         return True
 
     except Exception as e:
-        print(f"❌ MCP tools test error: {e}")
+        _reporter.log(f"❌ MCP tools test error: {e}")
         return False
 
 def test_model_configuration():
     """Test model configuration."""
-    print("\n🔍 Testing model configuration...")
+    _reporter.log("\n🔍 Testing model configuration...")
 
     try:
-        from vllm_mcp.server import MultimodalMCPServer
+        server = _get_server()
 
-        server = MultimodalMCPServer()
+        configs_by_type = {
+            config.get("provider_type"): config
+            for config in server.config.get("providers", [])
+        }
 
         # Check if providers have model configurations
         for provider_name, provider in server.providers.items():
-            if hasattr(provider, 'supported_models'):
-                print(f"✅ Provider '{provider_name}' has {len(provider.supported_models)} supported models")
+            models = getattr(provider, 'supported_models', None)
+            if models is None:
+                continue
 
-                # Find the provider config
-                provider_config = None
-                for config in server.config.get("providers", []):
-                    if config.get("provider_type") == provider_name:
-                        provider_config = config
-                        break
+            model_count = len(models)
+            _reporter.log(f"✅ Provider '{provider_name}' has {model_count} supported models")
 
-                if provider_config:
-                    default_model = provider_config.get("default_model")
-                    print(f"   Default model: {default_model}")
-                    print(f"   Supported models: {', '.join(provider.supported_models[:3])}{'...' if len(provider.supported_models) > 3 else ''}")
+            # Find the provider config
+            provider_config = configs_by_type.get(provider_name)
+
+            if VERBOSE and provider_config:
+                default_model = provider_config.get("default_model")
+                _reporter.log(f"   Default model: {default_model}")
+                _reporter.log(f"   Supported models: {', '.join(models[:3])}{'...' if model_count > 3 else ''}")
 
         return True
 
     except Exception as e:
-        print(f"❌ Model configuration test error: {e}")
+        _reporter.log(f"❌ Model configuration test error: {e}")
         return False
 
 def main():
@@ -183,12 +221,21 @@ def main():
         test_model_configuration,
     ]
 
+    server_tests = {test_server_initialization, test_mcp_tools, test_model_configuration}
+
     passed = 0
     total = len(tests)
 
-    for test in tests:
-        if test():
-            passed += 1
+    # Build the shared server in the background while the checks that don't need it run
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        server_ready = executor.submit(_get_server)
+
+        for test in tests:
+            if test in server_tests:
+                wait([server_ready])
+            if test():
+                passed += 1
+            _reporter.flush()
 
     print("\n" + "=" * 40)
     print(f"📊 Test Results: {passed}/{total} tests passed")
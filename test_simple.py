@@ -3,102 +3,151 @@
 简单功能测试 - 测试基本配置和初始化
 """
 
+import functools
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+class Reporter:
+    """收集测试输出，并一次性写入标准输出"""
+
+    def __init__(self):
+        self._buf = []
+
+    def log(self, msg):
+        """追加一行输出"""
+        self._buf.append(msg)
+
+    def flush(self):
+        """写出所有缓存的输出并清空缓冲区"""
+        if self._buf:
+            sys.stdout.write("\n".join(self._buf) + "\n")
+            self._buf.clear()
+
+
+_reporter = Reporter()
+
+_HAS_OPENAI = bool(os.environ.get("OPENAI_API_KEY"))
+_HAS_DASHSCOPE = bool(os.environ.get("DASHSCOPE_API_KEY"))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_server():
+    """只构建一次服务器，供各测试共享"""
+    from vllm_mcp.server import MultimodalMCPServer
+
+    return MultimodalMCPServer()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config(path="config.json"):
+    """只解析一次配置文件，供各测试共享"""
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+
+def _scan_dir(path):
+    """一次列出目录中的所有条目，目录不存在时返回空字典"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except FileNotFoundError:
+        return {}
 
 
 def test_basic_imports():
     """测试基本导入功能"""
-    print("🔍 测试基本导入...")
+    _reporter.log("🔍 测试基本导入...")
 
     try:
         from vllm_mcp.models import MultimodalRequest, TextContent
         from vllm_mcp.providers.dashscope_provider import DashscopeProvider
         from vllm_mcp.server import MultimodalMCPServer
-        print("✅ 所有模块导入成功")
+        _reporter.log("✅ 所有模块导入成功")
         return True
     except ImportError as e:
-        print(f"❌ 导入失败: {e}")
+        _reporter.log(f"❌ 导入失败: {e}")
         return False
 
 
 def test_server_initialization():
     """测试服务器初始化"""
-    print("\n🔍 测试服务器初始化...")
+    _reporter.log("\n🔍 测试服务器初始化...")
 
     try:
-        from vllm_mcp.server import MultimodalMCPServer
-
-        server = MultimodalMCPServer()
-        print(f"✅ 服务器初始化成功")
-        print(f"   配置的提供商数量: {len(server.config.get('providers', []))}")
-        print(f"   已初始化的提供商: {list(server.providers.keys())}")
+        server = _get_server()
+        _reporter.log(f"✅ 服务器初始化成功")
+        _reporter.log(f"   配置的提供商数量: {len(server.config.get('providers', []))}")
+        _reporter.log(f"   已初始化的提供商: {list(server.providers.keys())}")
 
         if 'dashscope' in server.providers:
             provider = server.providers['dashscope']
-            print(f"   Dashscope 支持的模型数: {len(provider.supported_models)}")
-            print(f"   默认模型: qwen-vl-plus")
+            _reporter.log(f"   Dashscope 支持的模型数: {len(provider.supported_models)}")
+            _reporter.log(f"   默认模型: qwen-vl-plus")
 
         return True
     except Exception as e:
-        print(f"❌ 服务器初始化失败: {e}")
+        _reporter.log(f"❌ 服务器初始化失败: {e}")
         return False
 
 
 def test_environment_config():
     """测试环境配置"""
-    print("\n🔍 测试环境配置...")
+    _reporter.log("\n🔍 测试环境配置...")
 
     # 检查环境变量
-    dashscope_key = os.getenv("DASHSCOPE_API_KEY")
-    openai_key = os.getenv("OPENAI_API_KEY")
+    _reporter.log(f"   DASHSCOPE_API_KEY: {'✅ 已设置' if _HAS_DASHSCOPE else '⚠️  未设置'}")
+    _reporter.log(f"   OPENAI_API_KEY: {'✅ 已设置' if _HAS_OPENAI else '⚠️  未设置'}")
 
-    print(f"   DASHSCOPE_API_KEY: {'✅ 已设置' if dashscope_key else '⚠️  未设置'}")
-    print(f"   OPENAI_API_KEY: {'✅ 已设置' if openai_key else '⚠️  未设置'}")
-
-    if dashscope_key:
-        print("   ✅ Dashscope 配置正常，可以测试模型")
+    if _HAS_DASHSCOPE:
+        _reporter.log("   ✅ Dashscope 配置正常，可以测试模型")
         return True
     else:
-        print("   ⚠️  需要 Dashscope API 密钥才能测试模型")
+        _reporter.log("   ⚠️  需要 Dashscope API 密钥才能测试模型")
         return False
 
 
 def test_configuration_file():
     """测试配置文件"""
-    print("\n🔍 测试配置文件...")
+    _reporter.log("\n🔍 测试配置文件...")
 
     try:
         if os.path.exists("config.json"):
-            import json
-            with open("config.json", 'r') as f:
-                config = json.load(f)
+            config = _load_config()
 
-            print(f"✅ 配置文件加载成功")
-            print(f"   传输方式: {config.get('transport', 'stdio')}")
-            print(f"   主机: {config.get('host', 'localhost')}")
-            print(f"   端口: {config.get('port', 8080)}")
-            print(f"   提供商配置: {len(config.get('providers', []))}")
+            _reporter.log(f"✅ 配置文件加载成功")
+            _reporter.log(f"   传输方式: {config.get('transport', 'stdio')}")
+            _reporter.log(f"   主机: {config.get('host', 'localhost')}")
+            _reporter.log(f"   端口: {config.get('port', 8080)}")
+            _reporter.log(f"   提供商配置: {len(config.get('providers', []))}")
 
             return True
         else:
-            print("⚠️  config.json 文件不存在")
+            _reporter.log("⚠️  config.json 文件不存在")
             return False
     except Exception as e:
-        print(f"❌ 配置文件加载失败: {e}")
+        _reporter.log(f"❌ 配置文件加载失败: {e}")
         return False
 
 
 def test_startup_script():
     """测试启动脚本"""
-    print("\n🔍 测试启动脚本...")
+    _reporter.log("\n🔍 测试启动脚本...")
 
-    scripts = ["scripts/start.sh", "scripts/start-dev.sh"]
+    entries = _scan_dir("scripts")
 
-    for script in scripts:
-        if os.path.exists(script) and os.access(script, os.X_OK):
-            print(f"   ✅ {script} 存在且可执行")
+    for name in ("start.sh", "start-dev.sh"):
+        script = f"scripts/{name}"
+        entry = entries.get(name)
+        if entry is not None and entry.stat().st_mode & 0o111:
+            _reporter.log(f"   ✅ {script} 存在且可执行")
         else:
-            print(f"   ❌ {script} 不存在或不可执行")
+            _reporter.log(f"   ❌ {script} 不存在或不可执行")
             return False
 
     return True
@@ -106,19 +155,16 @@ def test_startup_script():
 
 def test_examples():
     """测试示例文件"""
-    print("\n🔍 测试示例文件...")
+    _reporter.log("\n🔍 测试示例文件...")
 
-    examples = [
-        "examples/client_example.py",
-        "examples/list_models.py",
-        "examples/mcp_client_config.json"
-    ]
+    entries = _scan_dir("examples")
 
-    for example in examples:
-        if os.path.exists(example):
-            print(f"   ✅ {example} 存在")
+    for name in ("client_example.py", "list_models.py", "mcp_client_config.json"):
+        example = f"examples/{name}"
+        if name in entries:
+            _reporter.log(f"   ✅ {example} 存在")
         else:
-            print(f"   ❌ {example} 不存在")
+            _reporter.log(f"   ❌ {example} 不存在")
             return False
 
     return True
@@ -129,23 +175,26 @@ def main():
     print("🚀 VLLM MCP Server 简单功能测试")
     print("=" * 50)
 
+    # 服务器初始化放在最后，以便在其他检查运行时于后台构建服务器
     tests = [
         ("基本导入", test_basic_imports),
-        ("服务器初始化", test_server_initialization),
         ("环境配置", test_environment_config),
         ("配置文件", test_configuration_file),
         ("启动脚本", test_startup_script),
         ("示例文件", test_examples),
+        ("服务器初始化", test_server_initialization),
     ]
 
     results = {}
 
-    for test_name, test_func in tests:
-        try:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        server_ready = executor.submit(_get_server)
+
+        for test_name, test_func in tests:
+            if test_func is test_server_initialization:
+                wait([server_ready])
             results[test_name] = test_func()
-        except Exception as e:
-            print(f"❌ {test_name} 测试异常: {e}")
-            results[test_name] = False
+            _reporter.flush()
 
     # 测试结果汇总
     print("\n" + "=" * 50)
@@ -167,7 +216,7 @@ def main():
         print("   2. 启动服务器: ./scripts/start.sh")
         print("   3. 查看模型列表: uv run python examples/list_models.py")
 
-        if os.getenv("DASHSCOPE_API_KEY"):
+        if _HAS_DASHSCOPE:
             print("   4. 测试文本生成（已配置 Dashscope）")
 
         return True